@@ -1,7 +1,10 @@
 import logging
+import time
 from typing import List, Dict, Optional
 from openai import AsyncOpenAI
 
+from app.core.metrics import LLM_REQUEST_DURATION, LLM_TOKENS
+
 
 logger = logging.getLogger(__name__)
 SYSTEM_PROMPT = """
@@ -62,14 +65,18 @@ class LLMClient:
 
     async def generate(self, messages: List[Dict], temperature: float = 0.3) -> str:
         payload = [{"role": "system", "content": SYSTEM_PROMPT}, *messages]
+        started = time.perf_counter()
         try:
             completion = await self._client.chat.completions.create(
                 model=self.model,
                 messages=payload,
                 temperature=temperature,
             )
+            LLM_REQUEST_DURATION.labels("success").observe(time.perf_counter() - started)
             usage = getattr(completion, "usage", None)
             if usage:
+                LLM_TOKENS.labels("prompt").inc(getattr(usage, "prompt_tokens", None) or 0)
+                LLM_TOKENS.labels("completion").inc(getattr(usage, "completion_tokens", None) or 0)
                 logger.info(
                     "LLM usage: prompt_tokens=%s, completion_tokens=%s, total_tokens=%s",
                     getattr(usage, "prompt_tokens", None),
@@ -80,6 +87,7 @@ class LLMClient:
                 return completion.choices[0].message.content or ""
             return ""
         except Exception as exc:
+            LLM_REQUEST_DURATION.labels("error").observe(time.perf_counter() - started)
             logger.exception("LLMClient.generate error: %s", exc)
             raise
 
@@ -0,0 +1,33 @@
+import logging
+import threading
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Lazy(Generic[T]):
+    """Отложенное создание объекта (и импорт его зависимостей) при первом обращении"""
+
+    def __init__(self, factory: Callable[[], T], name: str) -> None:
+        self._factory = factory
+        self._name = name
+        self._instance: Optional[T] = None
+        self._lock = threading.Lock()
+
+    @property
+    def initialized(self) -> bool:
+        return self._instance is not None
+
+    def get(self) -> T:
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                if self._instance is None:
+                    started = time.perf_counter()
+                    self._instance = self._factory()
+                    logger.info(f"{self._name} инициализирован за {time.perf_counter() - started:.3f} с")
+                instance = self._instance
+        return instance
@@ -0,0 +1,364 @@
+import asyncio
+import logging
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+# Метрики обновляются и из event loop, и из рабочих потоков (запись телеметрии),
+# поэтому каждая серия защищена своей блокировкой
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self) -> None:
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self) -> None:
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        self.bounds = bounds
+        # Последняя ячейка — значения больше верхней границы (+Inf)
+        self.counts: List[int] = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        """Согласованные counts, sum и count для отдачи"""
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+    def time(self) -> "_Timer":
+        return _Timer(self)
+
+
+class _Timer:
+    """Контекстный менеджер для замера длительности блока в гистограмму"""
+
+    __slots__ = ("_child", "_started")
+
+    def __init__(self, child: _HistogramChild) -> None:
+        self._child = child
+        self._started = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._child.observe(time.perf_counter() - self._started)
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames: Tuple[str, ...] = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Получение (или создание) серии с указанными значениями меток"""
+        key = tuple(values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name}: ожидается {len(self.labelnames)} меток, получено {len(key)}")
+            # setdefault атомарен: при гонке потоков обе стороны получат одну серию
+            child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+            for key, child in list(self._children.items())
+        ]
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+            for key, child in list(self._children.items())
+        ]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self) -> _Timer:
+        return self.labels().time()
+
+    def _samples(self) -> List[str]:
+        lines: List[str] = []
+        for key, child in list(self._children.items()):
+            counts, total, observed = child.snapshot()
+            cumulative = 0
+            for bound, count in zip((*child.bounds, float("inf")), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {observed}")
+        return lines
+
+
+class Registry:
+    """Реестр метрик, отдаваемых в текстовом формате Prometheus"""
+
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+# OBD
+OBD_COMMAND_DURATION = REGISTRY.register(Histogram(
+    "obd_command_duration_seconds", "Длительность запроса OBD команды", ["command"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+))
+OBD_LOCK_WAIT = REGISTRY.register(Histogram(
+    "obd_lock_wait_seconds", "Ожидание освободившегося соединения с OBD адаптером перед запросом",
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+))
+OBD_COMMAND_ERRORS = REGISTRY.register(Counter(
+    "obd_command_errors_total", "Исключения при запросе OBD команды", ["command"],
+))
+OBD_CONNECTED = REGISTRY.register(Gauge(
+    "obd_connected", "Состояние подключения к OBD адаптеру (1 — подключено)",
+))
+OBD_CONNECTED.set(0)
+OBD_CONNECT_ATTEMPTS = REGISTRY.register(Counter(
+    "obd_connect_attempts_total", "Попытки подключения к OBD адаптеру", ["result"],
+))
+OBD_RECONNECTS = REGISTRY.register(Counter(
+    "obd_reconnects_total", "Повторные подключения к OBD адаптеру после успешного",
+))
+
+# LLM
+LLM_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "llm_request_duration_seconds", "Длительность запроса к LLM", ["outcome"],
+    buckets=(0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0),
+))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "llm_tokens_total", "Токены, израсходованные LLM", ["kind"],
+))
+
+# Redis
+REDIS_OPERATION_DURATION = REGISTRY.register(Histogram(
+    "redis_operation_duration_seconds", "Длительность операций RedisContextStore", ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+))
+
+# Telegram
+TELEGRAM_SEND_RETRIES = REGISTRY.register(Counter(
+    "telegram_send_retries_total", "Повторные попытки отправки сообщений в Telegram",
+))
+TELEGRAM_SEND_FAILURES = REGISTRY.register(Counter(
+    "telegram_send_failures_total", "Сообщения, которые не удалось отправить после всех попыток",
+))
+TELEGRAM_RATE_LIMITED = REGISTRY.register(Counter(
+    "telegram_rate_limited_total", "Ответы Telegram 429 (flood control)",
+))
+TELEGRAM_EDITS_COALESCED = REGISTRY.register(Counter(
+    "telegram_edits_coalesced_total", "Правки сообщений, объединенные с уже ожидающей правкой",
+))
+TELEGRAM_SEND_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "telegram_send_queue_depth", "Запросы в очереди отправки Telegram",
+))
+
+# Рендеринг ответов
+RENDER_CACHE_REQUESTS = REGISTRY.register(Counter(
+    "render_cache_requests_total", "Обращения к кешу отрендеренных ответов", ["view", "result"],
+))
+
+# Event loop
+EVENT_LOOP_LAG = REGISTRY.register(Histogram(
+    "event_loop_lag_seconds", "Задержка пробуждения event loop относительно запланированного времени",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+))
+
+
+async def _monitor_event_loop_lag(interval: float) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - expected))
+
+
+async def _handle_http(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+        # Остаток заголовков нам не нужен, но его нужно вычитать
+        while True:
+            line = await asyncio.wait_for(reader.readline(), timeout=5)
+            if not line or line in (b"\r\n", b"\n"):
+                break
+
+        parts = request_line.decode("latin-1").split()
+        path = parts[1].split("?", 1)[0] if len(parts) > 1 else ""
+        if path == "/metrics":
+            status = "200 OK"
+            body = REGISTRY.render().encode("utf-8")
+        else:
+            status = "404 Not Found"
+            body = b"Not Found\n"
+
+        writer.write(
+            f"HTTP/1.1 {status}\r\n"
+            "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+    except Exception as e:
+        logger.debug(f"Ошибка обработки запроса метрик: {e}")
+    finally:
+        writer.close()
+
+
+class MetricsServer:
+    """HTTP сервер метрик и фоновый замер задержки event loop"""
+
+    def __init__(self, host: str, port: int, lag_interval: float = 1.0) -> None:
+        self.host = host
+        self.port = port
+        self.lag_interval = lag_interval
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._lag_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(_handle_http, self.host, self.port)
+        self._lag_task = asyncio.create_task(_monitor_event_loop_lag(self.lag_interval))
+        logger.info(f"Метрики доступны на http://{self.host}:{self.port}/metrics")
+
+    async def stop(self) -> None:
+        if self._lag_task:
+            self._lag_task.cancel()
+            try:
+                await self._lag_task
+            except asyncio.CancelledError:
+                pass
+            self._lag_task = None
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
@@ -31,6 +31,17 @@ class Settings(BaseSettings):
     # Redis для хранения контекста
     REDIS_URL: str = Field(default="redis://redis:6379/0", description="URL подключения к Redis для хранения контекста")
 
+    # Метрики (Prometheus)
+    METRICS_ENABLED: bool = Field(default=True, description="Отдавать метрики в формате Prometheus")
+    METRICS_HOST: str = Field(default="127.0.0.1", description="Адрес HTTP сервера метрик")
+    METRICS_PORT: int = Field(default=9108, description="Порт HTTP сервера метрик")
+
+    # Запись телеметрии для экспорта (/export)
+    TELEMETRY_ENABLED: bool = Field(default=True, description="Записывать замеры OBD, пока адаптер подключен")
+    TELEMETRY_DIR: str = Field(default="data/telemetry", description="Каталог файлов телеметрии")
+    TELEMETRY_INTERVAL: float = Field(default=1.0, description="Интервал записи телеметрии в секундах")
+    TELEMETRY_RETENTION_DAYS: int = Field(default=30, description="Сколько дней хранить файлы телеметрии (0 — без ограничения)")
+
     @property
     def admin_ids_list(self) -> list[int]:
         """Получить список ID администраторов"""
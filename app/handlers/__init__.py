@@ -1,3 +1,3 @@
 from .chat import register_chat_handlers
-
-
+from .export import register_export_handlers
+from .obd import register_obd_handlers
@@ -1,10 +1,11 @@
-import asyncio
 import logging
 from aiogram import F, Router
 from aiogram.types import Message
 from aiogram.enums import ChatAction
 from aiogram.exceptions import TelegramNetworkError
 
+from app.services.send_queue import Priority
+
 logger = logging.getLogger(__name__)
 
 
@@ -30,19 +31,7 @@ def _session_key(message: Message, is_private: bool) -> str:
     return f"chat:{message.chat.id}"
 
 
-def register_chat_handlers(router: Router, llm_client, context_store) -> None:
-    async def _send_with_retry(message: Message, text: str, attempts: int = 3) -> None:
-        for attempt in range(1, attempts + 1):
-            try:
-                await message.answer(text)
-                return
-            except TelegramNetworkError as exc:
-                if attempt == attempts:
-                    logger.exception("Failed to send message after retries: %s", exc)
-                    raise
-                logger.warning("Telegram network error, retry %s/%s: %s", attempt, attempts, exc)
-                await asyncio.sleep(1)
-
+def register_chat_handlers(router: Router, llm_provider, context_provider, send_queue) -> None:
     @router.message(F.text)
     async def handle_free_text(message: Message):
         if not message.text or message.text.startswith("/"):
@@ -54,6 +43,7 @@ def register_chat_handlers(router: Router, llm_client, context_store) -> None:
         text = message.text.strip()
         enriched_text = f"{user_identity}\nMessage: {text}"
 
+        context_store = context_provider.get()
         await context_store.append(session_key, "user", enriched_text)
         history = await context_store.history(session_key)
 
@@ -66,7 +56,7 @@ def register_chat_handlers(router: Router, llm_client, context_store) -> None:
             pass
 
         try:
-            reply = await llm_client.generate(history, temperature=0.3)
+            reply = await llm_provider.get().generate(history, temperature=0.3)
             if not reply:
                 reply = "❌ Не удалось получить ответ от модели."
         except Exception as e:
@@ -75,7 +65,7 @@ def register_chat_handlers(router: Router, llm_client, context_store) -> None:
 
         await context_store.append(session_key, "assistant", reply)
         try:
-            await _send_with_retry(message, reply)
+            await send_queue.reply(message, reply, priority=Priority.REPLY)
         except TelegramNetworkError:
             # Если не удалось отправить даже после ретраев, просто выходим
             pass
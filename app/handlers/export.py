@@ -0,0 +1,63 @@
+import asyncio
+import logging
+import os
+from aiogram import Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import FSInputFile, Message
+
+from app.services.telemetry_export import EXPORT_FORMATS, export_to_tempfile, parquet_available, parse_window
+
+logger = logging.getLogger(__name__)
+
+# Ограничение Bot API на размер отправляемого документа
+MAX_DOCUMENT_SIZE = 50 * 1024 * 1024
+
+USAGE = (
+    "Использование: /export <окно> [csv|parquet]\n"
+    "Окно: 90s, 30m, 24h, 7d (не больше 366d). Например: /export 24h parquet"
+)
+
+
+def register_export_handlers(router: Router, telemetry_store, send_queue) -> None:
+    @router.message(Command("export"))
+    async def cmd_export(message: Message, command: CommandObject):
+        """Обработчик команды /export - выгрузка записанной телеметрии файлом"""
+        args = (command.args or "").split()
+        window = args[0] if args else "1h"
+        fmt = args[1].lower() if len(args) > 1 else "csv"
+
+        try:
+            window_seconds = parse_window(window)
+        except ValueError:
+            await send_queue.reply(message, USAGE)
+            return
+        if fmt not in EXPORT_FORMATS:
+            await send_queue.reply(message, USAGE)
+            return
+
+        await send_queue.reply(message, "⏳ Готовлю экспорт...")
+        try:
+            # Запись файла блокирующая — выполняем в отдельном потоке
+            path, rows = await asyncio.to_thread(export_to_tempfile, telemetry_store, window_seconds, fmt)
+        except Exception as e:
+            logger.error(f"Ошибка экспорта телеметрии: {e}")
+            await send_queue.reply(message, f"❌ Не удалось выполнить экспорт: {e}")
+            return
+
+        try:
+            if rows == 0:
+                await send_queue.reply(message, f"📭 Нет записанных данных за {window}")
+                return
+            if os.path.getsize(path) > MAX_DOCUMENT_SIZE:
+                hint = "Уменьшите окно"
+                if fmt == "csv" and parquet_available():
+                    hint += " или используйте формат parquet"
+                await send_queue.reply(message, f"❌ Файл больше 50 МБ. {hint}")
+                return
+            await send_queue.reply_document(
+                message,
+                FSInputFile(path, filename=f"telemetry-{window}.{fmt}"),
+                caption=f"📁 Телеметрия за {window}: {rows} записей",
+            )
+        finally:
+            os.remove(path)
@@ -0,0 +1,151 @@
+import asyncio
+import logging
+from aiogram import F, Router, types
+from aiogram.filters import Command
+from aiogram.types import Message, InlineKeyboardButton
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+from app.services.render import ReplyRenderer, format_errors
+
+logger = logging.getLogger(__name__)
+
+
+def register_obd_handlers(router: Router, obd_provider, send_queue) -> None:
+    """Регистрация команд OBD; сам OBDHandler (и python-OBD) создается при первом обращении"""
+
+    renderer = ReplyRenderer()
+
+    # Запросы к OBD блокирующие (и ждут фоновую запись телеметрии на блокировке
+    # соединения), поэтому выполняются в потоке, а не в event loop. Первый connect
+    # в потоке заодно импортирует python-OBD
+
+    def _is_connected() -> bool:
+        return obd_provider.initialized and obd_provider.get().is_connected
+
+    @router.message(Command("start"))
+    async def cmd_start(message: Message):
+        """Обработчик команды /start"""
+        keyboard = InlineKeyboardBuilder()
+        keyboard.add(InlineKeyboardButton(text="📊 Все данные", callback_data="all_data"))
+        keyboard.add(InlineKeyboardButton(text="🌡️ Температура", callback_data="temperature"))
+        keyboard.add(InlineKeyboardButton(text="⚠️ Ошибки", callback_data="errors"))
+        keyboard.add(InlineKeyboardButton(text="🔌 Подключить OBD", callback_data="connect"))
+        keyboard.add(InlineKeyboardButton(text="❌ Отключить OBD", callback_data="disconnect"))
+        keyboard.adjust(2, 2, 1)
+
+        await send_queue.reply(
+            message,
+            "🚗 Добро пожаловать в Mercedes OBD бот!\n\n"
+            "Выберите действие:",
+            reply_markup=keyboard.as_markup()
+        )
+
+    @router.message(Command("connect"))
+    async def cmd_connect(message: Message):
+        """Обработчик команды /connect"""
+        await send_queue.reply(message, "⏳ Подключение к OBD адаптеру...")
+
+        if await asyncio.to_thread(lambda: obd_provider.get().connect()):
+            await send_queue.reply(message, "✅ Успешно подключено к OBD адаптеру!")
+        else:
+            await send_queue.reply(
+                message,
+                "❌ Не удалось подключиться к OBD адаптеру.\n\n"
+                "Проверьте:\n"
+                "• Адаптер подключен и включен\n"
+                "• Bluetooth соединение установлено\n"
+                "• Правильно указан порт в настройках"
+            )
+
+    @router.message(Command("disconnect"))
+    async def cmd_disconnect(message: Message):
+        """Обработчик команды /disconnect"""
+        if obd_provider.initialized:
+            await asyncio.to_thread(obd_provider.get().disconnect)
+        await send_queue.reply(message, "🔌 Отключено от OBD адаптера")
+
+    @router.message(Command("status"))
+    async def cmd_status(message: Message):
+        """Обработчик команды /status"""
+        status = "🟢 Подключено" if _is_connected() else "🔴 Не подключено"
+        await send_queue.reply(message, f"Статус OBD: {status}")
+
+    @router.message(Command("errors"))
+    async def cmd_errors(message: Message):
+        """Обработчик команды /errors"""
+        if not _is_connected():
+            await send_queue.reply(message, "❌ Сначала подключитесь к OBD адаптеру (/connect)")
+            return
+
+        errors = await asyncio.to_thread(obd_provider.get().get_errors)
+        await send_queue.reply(message, format_errors(errors))
+
+    @router.message(Command("clear_errors"))
+    async def cmd_clear_errors(message: Message):
+        """Обработчик команды /clear_errors"""
+        if not _is_connected():
+            await send_queue.reply(message, "❌ Сначала подключитесь к OBD адаптеру (/connect)")
+            return
+
+        if await asyncio.to_thread(obd_provider.get().clear_errors):
+            await send_queue.reply(message, "✅ Коды ошибок очищены")
+        else:
+            await send_queue.reply(message, "❌ Не удалось очистить коды ошибок")
+
+    @router.message(Command("temperature"))
+    async def cmd_temperature(message: Message):
+        """Обработчик команды /temperature"""
+        if not _is_connected():
+            await send_queue.reply(message, "❌ Сначала подключитесь к OBD адаптеру (/connect)")
+            return
+
+        text = renderer.temperature(await asyncio.to_thread(obd_provider.get().get_temperature_snapshot))
+        await send_queue.reply(message, text)
+
+    @router.message(Command("data"))
+    async def cmd_data(message: Message):
+        """Обработчик команды /data - все данные"""
+        if not _is_connected():
+            await send_queue.reply(message, "❌ Сначала подключитесь к OBD адаптеру (/connect)")
+            return
+
+        text = renderer.data(await asyncio.to_thread(obd_provider.get().get_snapshot))
+        await send_queue.reply(message, text)
+
+    @router.callback_query(F.data)
+    async def process_callback(callback: types.CallbackQuery):
+        """Обработчик callback кнопок"""
+        await callback.answer()
+
+        if callback.data == "connect":
+            await send_queue.reply(callback.message, "⏳ Подключение к OBD адаптеру...")
+            if await asyncio.to_thread(lambda: obd_provider.get().connect()):
+                await send_queue.reply(callback.message, "✅ Успешно подключено к OBD адаптеру!")
+            else:
+                await send_queue.reply(callback.message, "❌ Не удалось подключиться к OBD адаптеру.")
+
+        elif callback.data == "disconnect":
+            if obd_provider.initialized:
+                await asyncio.to_thread(obd_provider.get().disconnect)
+            await send_queue.reply(callback.message, "🔌 Отключено от OBD адаптера")
+
+        elif callback.data == "errors":
+            if not _is_connected():
+                await send_queue.reply(callback.message, "❌ Сначала подключитесь к OBD адаптеру")
+                return
+            errors = await asyncio.to_thread(obd_provider.get().get_errors)
+            await send_queue.reply(callback.message, format_errors(errors))
+
+        elif callback.data == "temperature":
+            if not _is_connected():
+                await send_queue.reply(callback.message, "❌ Сначала подключитесь к OBD адаптеру")
+                return
+            text = renderer.temperature(await asyncio.to_thread(obd_provider.get().get_temperature_snapshot))
+            await send_queue.reply(callback.message, text)
+
+        elif callback.data == "all_data":
+            if not _is_connected():
+                await send_queue.reply(callback.message, "❌ Сначала подключитесь к OBD адаптеру")
+                return
+            text = renderer.data(await asyncio.to_thread(obd_provider.get().get_snapshot))
+            await send_queue.reply(callback.message, text)
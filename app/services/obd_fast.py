@@ -0,0 +1,91 @@
+"""
+Быстрые декодеры для частых PID Mode 01.
+
+Стандартные декодеры python-OBD возвращают pint Quantity, что при высокой
+частоте опроса дает заметную нагрузку на CPU (аллокации и работа с единицами).
+Здесь значения считаются напрямую из байтов ответа и возвращаются как float.
+Модуль не импортирует python-OBD: команды клонируются из переданных объектов.
+"""
+from typing import Any, Callable, Dict, List, Optional
+
+
+# В message.data первые два байта — режим и PID, далее байты A, B, ...
+# python-OBD дополняет/обрезает data до размера команды, поэтому индексы безопасны
+
+def decode_rpm(messages) -> float:
+    d = messages[0].data
+    return ((d[2] << 8) | d[3]) / 4.0
+
+
+def decode_speed(messages) -> float:
+    return float(messages[0].data[2])
+
+
+def decode_temp(messages) -> float:
+    return messages[0].data[2] - 40.0
+
+
+def decode_percent(messages) -> float:
+    return messages[0].data[2] * 100.0 / 255.0
+
+
+FAST_DECODERS: Dict[str, Callable[[Any], float]] = {
+    "RPM": decode_rpm,
+    "SPEED": decode_speed,
+    "COOLANT_TEMP": decode_temp,
+    "INTAKE_TEMP": decode_temp,
+    "ENGINE_LOAD": decode_percent,
+    "FUEL_LEVEL": decode_percent,
+    "THROTTLE_POS": decode_percent,
+}
+
+
+def make_fast_command(command):
+    """Копия OBD команды с быстрым декодером вместо декодера python-OBD"""
+    fast = command.clone()
+    fast.decode = FAST_DECODERS[command.name]
+    return fast
+
+
+class TelemetrySample:
+    """Компактная запись одного замера телеметрии"""
+
+    __slots__ = (
+        "timestamp",
+        "rpm",
+        "speed",
+        "coolant_temp",
+        "intake_temp",
+        "engine_load",
+        "fuel_level",
+    )
+
+    FIELDS = __slots__
+
+    def __init__(
+        self,
+        timestamp: float,
+        rpm: Optional[float] = None,
+        speed: Optional[float] = None,
+        coolant_temp: Optional[float] = None,
+        intake_temp: Optional[float] = None,
+        engine_load: Optional[float] = None,
+        fuel_level: Optional[float] = None,
+    ) -> None:
+        self.timestamp = timestamp
+        self.rpm = rpm
+        self.speed = speed
+        self.coolant_temp = coolant_temp
+        self.intake_temp = intake_temp
+        self.engine_load = engine_load
+        self.fuel_level = fuel_level
+
+    def as_tuple(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def as_dict(self) -> Dict[str, Optional[float]]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        fields: List[str] = [f"{name}={getattr(self, name)!r}" for name in self.__slots__]
+        return f"TelemetrySample({', '.join(fields)})"
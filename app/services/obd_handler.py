@@ -1,10 +1,25 @@
 import obd
 import logging
+import threading
+import time
 from typing import Optional, Dict, Any
 from app.settings import settings
+from app.core.metrics import (
+    OBD_COMMAND_DURATION,
+    OBD_COMMAND_ERRORS,
+    OBD_CONNECTED,
+    OBD_CONNECT_ATTEMPTS,
+    OBD_LOCK_WAIT,
+    OBD_RECONNECTS,
+)
+from app.services.obd_fast import FAST_DECODERS, TelemetrySample, make_fast_command
+from app.services.snapshot import TelemetrySnapshot, TemperatureSnapshot
 
 logger = logging.getLogger(__name__)
 
+# Частые PID опрашиваются командами с быстрыми декодерами (float вместо pint Quantity)
+FAST_COMMANDS = {name: make_fast_command(obd.commands[name]) for name in FAST_DECODERS}
+
 
 class OBDHandler:
     """Обработчик подключения к OBD-II адаптеру"""
@@ -12,15 +27,50 @@ class OBDHandler:
     def __init__(self):
         self.connection: Optional[obd.OBD] = None
         self.is_connected = False
+        self._was_connected = False
+        # Соединение используется и из обработчиков, и из фоновой записи телеметрии
+        self._lock = threading.Lock()
+        self._snapshot_lock = threading.Lock()
+        self._snapshot: Optional[TelemetrySnapshot] = None
+        self._snapshot_at = 0.0
+        self._snapshot_version = 0
+        self._temperature_lock = threading.Lock()
+        self._temperature: Optional[TemperatureSnapshot] = None
+        self._temperature_at = 0.0
+        self._temperature_version = 0
+        # Последний замер частых PID (обычно от фоновой записи телеметрии)
+        self._last_sample: Optional[TelemetrySample] = None
+    
+    def _query(self, command):
+        """Запрос OBD команды с замером длительности"""
+        waiting = time.perf_counter()
+        with self._lock:
+            # Ожидание соединения (занятого записью телеметрии) считаем отдельно от запроса
+            started = time.perf_counter()
+            OBD_LOCK_WAIT.observe(started - waiting)
+            try:
+                return self.connection.query(command)
+            except Exception:
+                OBD_COMMAND_ERRORS.labels(command.name).inc()
+                raise
+            finally:
+                OBD_COMMAND_DURATION.labels(command.name).observe(time.perf_counter() - started)
+    
+    def _set_connected(self, connected: bool):
+        self.is_connected = connected
+        OBD_CONNECTED.set(1 if connected else 0)
     
     def connect(self) -> bool:
         """Подключение к OBD адаптеру"""
+        # Переподключение — успешное подключение после потери ранее установленной связи
+        reconnecting = self._was_connected and not self.is_connected
         try:
             port = settings.OBD_PORT or obd.scan_serial()
             if not port:
                 logger.error("OBD адаптер не найден")
                 if settings.OBD_MAC:
                     logger.info(f"OBD_MAC указан: {settings.OBD_MAC}, но порт не найден. Проверьте, что RFCOMM порт создан.")
+                OBD_CONNECT_ATTEMPTS.labels("failure").inc()
                 return False
             
             logger.info(f"Подключение к OBD на порту: {port}")
@@ -42,25 +92,32 @@ class OBDHandler:
             except:
                 status = None
             
-            self.is_connected = status == obd.OBDStatus.CAR_CONNECTED
+            self._set_connected(status == obd.OBDStatus.CAR_CONNECTED)
             
             if self.is_connected:
+                self._was_connected = True
+                OBD_CONNECT_ATTEMPTS.labels("success").inc()
+                if reconnecting:
+                    OBD_RECONNECTS.inc()
                 logger.info("Успешно подключено к OBD")
             else:
+                OBD_CONNECT_ATTEMPTS.labels("failure").inc()
                 logger.warning(f"Статус подключения: {status}")
             
             return self.is_connected
         except Exception as e:
             logger.error(f"Ошибка подключения к OBD: {e}")
-            self.is_connected = False
+            OBD_CONNECT_ATTEMPTS.labels("failure").inc()
+            self._set_connected(False)
             return False
     
     def disconnect(self):
         """Отключение от OBD адаптера"""
         if self.connection:
             try:
-                self.connection.close()
-                self.is_connected = False
+                with self._lock:
+                    self.connection.close()
+                self._set_connected(False)
                 logger.info("Отключено от OBD")
             except Exception as e:
                 logger.error(f"Ошибка отключения: {e}")
@@ -71,7 +128,7 @@ class OBDHandler:
             return []
         
         try:
-            response = self.connection.query(obd.commands.GET_DTC)
+            response = self._query(obd.commands.GET_DTC)
             if response.value:
                 errors = []
                 for code in response.value:
@@ -91,7 +148,7 @@ class OBDHandler:
             return False
         
         try:
-            response = self.connection.query(obd.commands.CLEAR_DTC)
+            response = self._query(obd.commands.CLEAR_DTC)
             return response.value is not None
         except Exception as e:
             logger.error(f"Ошибка очистки DTC: {e}")
@@ -104,15 +161,15 @@ class OBDHandler:
         
         try:
             if sensor == "coolant":
-                response = self.connection.query(obd.commands.COOLANT_TEMP)
+                response = self._query(FAST_COMMANDS["COOLANT_TEMP"])
             elif sensor == "intake":
-                response = self.connection.query(obd.commands.INTAKE_TEMP)
+                response = self._query(FAST_COMMANDS["INTAKE_TEMP"])
             else:
                 return None
             
             if response.value is not None:
                 try:
-                    return float(response.value.magnitude)
+                    return float(response.value)
                 except (AttributeError, ValueError):
                     return None
             return None
@@ -126,10 +183,10 @@ class OBDHandler:
             return None
         
         try:
-            response = self.connection.query(obd.commands.RPM)
+            response = self._query(FAST_COMMANDS["RPM"])
             if response.value is not None:
                 try:
-                    rpm = float(response.value.magnitude)
+                    rpm = float(response.value)
                     if rpm >= 0:
                         return rpm
                 except (AttributeError, ValueError, TypeError) as e:
@@ -145,10 +202,10 @@ class OBDHandler:
             return None
         
         try:
-            response = self.connection.query(obd.commands.SPEED)
+            response = self._query(FAST_COMMANDS["SPEED"])
             if response.value is not None:
                 try:
-                    speed = float(response.value.magnitude)
+                    speed = float(response.value)
                     if speed >= 0:
                         return speed
                 except (AttributeError, ValueError, TypeError) as e:
@@ -164,10 +221,10 @@ class OBDHandler:
             return None
         
         try:
-            response = self.connection.query(obd.commands.FUEL_LEVEL)
+            response = self._query(FAST_COMMANDS["FUEL_LEVEL"])
             if response.value is not None:
                 try:
-                    fuel_level = float(response.value.magnitude)
+                    fuel_level = float(response.value)
                     if 0 <= fuel_level <= 100:
                         return fuel_level
                 except (AttributeError, ValueError, TypeError) as e:
@@ -188,10 +245,10 @@ class OBDHandler:
             return None
         
         try:
-            response = self.connection.query(obd.commands.ENGINE_LOAD)
+            response = self._query(FAST_COMMANDS["ENGINE_LOAD"])
             if response.value is not None:
                 try:
-                    engine_load = float(response.value.magnitude)
+                    engine_load = float(response.value)
                     if 0 <= engine_load <= 100:
                         return engine_load
                 except (AttributeError, ValueError, TypeError) as e:
@@ -201,6 +258,30 @@ class OBDHandler:
             logger.error(f"Ошибка получения нагрузки двигателя: {e}")
             return None
     
+    def read_sample(self) -> Optional[TelemetrySample]:
+        """Один замер частых PID в компактную запись"""
+        if not self.is_connected or not self.connection:
+            return None
+        
+        sample = TelemetrySample(
+            timestamp=time.time(),
+            rpm=self.get_rpm(),
+            speed=self.get_speed(),
+            coolant_temp=self.get_temperature("coolant"),
+            intake_temp=self.get_temperature("intake"),
+            engine_load=self.get_engine_load(),
+            fuel_level=self.get_fuel_level(),
+        )
+        self._last_sample = sample
+        return sample
+    
+    def _recent_sample(self, max_age: float) -> Optional[TelemetrySample]:
+        """Последний замер, если он не старше max_age секунд"""
+        sample = self._last_sample
+        if sample is not None and time.time() - sample.timestamp < max_age:
+            return sample
+        return None
+    
     def get_all_data(self) -> Dict[str, Any]:
         """Получение всех доступных данных"""
         data = {
@@ -214,5 +295,47 @@ class OBDHandler:
             "errors": self.get_errors()
         }
         return data
-
-
+    
+    def get_snapshot(self, max_age: float = 2.0) -> TelemetrySnapshot:
+        """
+        Снимок всех данных; снимок моложе max_age секунд переиспользуется без запросов к OBD.
+        
+        Частые PID берутся из последнего замера записи телеметрии (опрос раз в
+        TELEMETRY_INTERVAL), если он не старше max_age; по запросу читаются только DTC.
+        """
+        # Одновременные запросы ждут один опрос и получают один и тот же снимок
+        with self._snapshot_lock:
+            return self._get_snapshot(max_age)
+    
+    def _get_snapshot(self, max_age: float) -> TelemetrySnapshot:
+        now = time.monotonic()
+        if self._snapshot is not None and now - self._snapshot_at < max_age:
+            return self._snapshot
+        
+        content = TelemetrySnapshot.content_from_sample(
+            self.is_connected, self._recent_sample(max_age) or self.read_sample(), self.get_errors()
+        )
+        # Версия растет только при изменении данных, чтобы рендер переиспользовался
+        if self._snapshot is None or content != self._snapshot.content():
+            self._snapshot_version += 1
+            self._snapshot = TelemetrySnapshot.from_content(self._snapshot_version, content)
+        self._snapshot_at = now
+        return self._snapshot
+    
+    def get_temperature_snapshot(self, max_age: float = 2.0) -> TemperatureSnapshot:
+        """Снимок температур: из последнего замера телеметрии или двумя запросами, без DTC и прочих PID"""
+        with self._temperature_lock:
+            now = time.monotonic()
+            if self._temperature is not None and now - self._temperature_at < max_age:
+                return self._temperature
+            
+            sample = self._recent_sample(max_age)
+            if sample is not None:
+                content = (sample.coolant_temp, sample.intake_temp)
+            else:
+                content = (self.get_temperature("coolant"), self.get_temperature("intake"))
+            if self._temperature is None or content != self._temperature.content():
+                self._temperature_version += 1
+                self._temperature = TemperatureSnapshot(self._temperature_version, *content)
+            self._temperature_at = now
+            return self._temperature
@@ -0,0 +1,86 @@
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Tuple, Union
+
+from app.core.metrics import RENDER_CACHE_REQUESTS
+from app.services.snapshot import TelemetrySnapshot, TemperatureSnapshot
+
+
+@lru_cache(maxsize=64)
+def _render_errors(errors: Tuple[Tuple[str, str], ...]) -> str:
+    if not errors:
+        return "✅ Ошибок не обнаружено"
+
+    parts = ["⚠️ Обнаружены ошибки:\n\n"]
+    for i, (code, description) in enumerate(errors, 1):
+        parts.append(f"{i}. {code}\n")
+        if description:
+            parts.append(f"   {description}\n")
+        parts.append("\n")
+    return "".join(parts)
+
+
+def format_errors(errors: list) -> str:
+    """Форматирование списка ошибок для вывода; текст кешируется по набору ошибок"""
+    return _render_errors(tuple((e.get("code", "N/A"), e.get("description") or "") for e in errors))
+
+
+def _render_data(snapshot: TelemetrySnapshot) -> str:
+    parts = [
+        "📊 Данные OBD:\n\n",
+        f"🔌 Статус: {'🟢 Подключено' if snapshot.connected else '🔴 Не подключено'}\n\n",
+    ]
+    if snapshot.rpm is not None:
+        parts.append(f"⚙️ Обороты: {snapshot.rpm:.0f} об/мин\n")
+    if snapshot.speed is not None:
+        parts.append(f"🚗 Скорость: {snapshot.speed:.0f} км/ч\n")
+    if snapshot.coolant_temp is not None:
+        parts.append(f"🌡️ Температура охлаждающей жидкости: {snapshot.coolant_temp:.1f}°C\n")
+    if snapshot.intake_temp is not None:
+        parts.append(f"🌡️ Температура впускного воздуха: {snapshot.intake_temp:.1f}°C\n")
+    if snapshot.fuel_level is not None:
+        parts.append(f"⛽ Уровень топлива: {snapshot.fuel_level:.1f}%\n")
+    if snapshot.engine_load is not None:
+        parts.append(f"⚡ Нагрузка двигателя: {snapshot.engine_load:.1f}%\n")
+    parts.append("\n")
+    parts.append(_render_errors(snapshot.errors))
+    return "".join(parts)
+
+
+def _render_temperature(snapshot: TemperatureSnapshot) -> str:
+    coolant = f"{snapshot.coolant_temp:.1f}°C" if snapshot.coolant_temp is not None else "N/A"
+    intake = f"{snapshot.intake_temp:.1f}°C" if snapshot.intake_temp is not None else "N/A"
+    return (
+        "🌡️ Температура:\n\n"
+        f"Охлаждающая жидкость: {coolant}\n"
+        f"Впускной воздух: {intake}\n"
+    )
+
+
+class ReplyRenderer:
+    """Текст ответов по снимку телеметрии; рендерится один раз на версию снимка"""
+
+    def __init__(self, max_entries: int = 32) -> None:
+        self._max_entries = max_entries
+        self._cache: "OrderedDict[Tuple[str, int], str]" = OrderedDict()
+
+    def _cached(self, view: str, snapshot: Union[TelemetrySnapshot, TemperatureSnapshot], render: Callable) -> str:
+        key = (view, snapshot.version)
+        text = self._cache.get(key)
+        if text is not None:
+            self._cache.move_to_end(key)
+            RENDER_CACHE_REQUESTS.labels(view, "hit").inc()
+            return text
+
+        RENDER_CACHE_REQUESTS.labels(view, "miss").inc()
+        text = render(snapshot)
+        self._cache[key] = text
+        if len(self._cache) > self._max_entries:
+            self._cache.popitem(last=False)
+        return text
+
+    def data(self, snapshot: TelemetrySnapshot) -> str:
+        return self._cached("data", snapshot, _render_data)
+
+    def temperature(self, snapshot: TemperatureSnapshot) -> str:
+        return self._cached("temperature", snapshot, _render_temperature)
@@ -0,0 +1,348 @@
+import asyncio
+import heapq
+import logging
+from enum import IntEnum
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from aiogram.exceptions import TelegramBadRequest, TelegramNetworkError, TelegramRetryAfter
+
+from app.core.metrics import (
+    TELEGRAM_EDITS_COALESCED,
+    TELEGRAM_RATE_LIMITED,
+    TELEGRAM_SEND_FAILURES,
+    TELEGRAM_SEND_QUEUE_DEPTH,
+    TELEGRAM_SEND_RETRIES,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Классы приоритета исходящих сообщений: меньше — раньше"""
+
+    ALERT = 0
+    REPLY = 1
+    DASHBOARD = 2
+
+
+def _thread_kwargs(message, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    if message.is_topic_message and "message_thread_id" not in kwargs:
+        kwargs["message_thread_id"] = message.message_thread_id
+    return kwargs
+
+
+class TokenBucket:
+    """Token bucket: rate токенов в секунду, не больше capacity про запас"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Сколько секунд ждать до появления токена"""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class _Job:
+    __slots__ = ("priority", "seq", "chat_id", "method", "kwargs", "futures", "edit_key", "attempts", "dispatched")
+
+    def __init__(self, priority: int, seq: int, chat_id: int, method: str, kwargs: Dict[str, Any],
+                 edit_key: Optional[Tuple[int, int]] = None) -> None:
+        self.priority = priority
+        self.seq = seq
+        self.chat_id = chat_id
+        self.method = method
+        self.kwargs = kwargs
+        self.futures: List[asyncio.Future] = []
+        self.edit_key = edit_key
+        self.attempts = 0
+        self.dispatched = False
+
+
+class SendQueue:
+    """
+    Центральная очередь исходящих запросов к Telegram.
+
+    Учитывает лимиты Bot API (общий и на каждый чат, для групп строже),
+    отправляет по приоритету, соблюдает retry_after из ответа 429 и
+    схлопывает ожидающие правки одного и того же сообщения.
+    """
+
+    def __init__(
+        self,
+        bot,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        chat_burst: float = 3.0,
+        group_rate: float = 20 / 60,
+        group_burst: float = 3.0,
+        concurrency: int = 8,
+        max_attempts: int = 3,
+    ) -> None:
+        self._bot = bot
+        self._global_rate = global_rate
+        self._chat_rate = chat_rate
+        self._chat_burst = chat_burst
+        self._group_rate = group_rate
+        self._group_burst = group_burst
+        self._max_attempts = max_attempts
+        self._concurrency = concurrency
+
+        self._heap: List[Tuple[int, int, _Job]] = []
+        # Число живых заданий в очереди; в куче бывают устаревшие записи после смены приоритета
+        self._queued = 0
+        self._seq = 0
+        self._pending_edits: Dict[Tuple[int, int], _Job] = {}
+        self._chat_buckets: Dict[int, TokenBucket] = {}
+        self._blocked_until: Dict[int, float] = {}
+        self._in_flight: Set[int] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._global: Optional[TokenBucket] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._runner: Optional[asyncio.Task] = None
+
+    # --- Публичный API ---
+
+    async def send_message(self, chat_id: int, text: str, priority: int = Priority.REPLY, **kwargs):
+        return await self.submit("send_message", dict(kwargs, chat_id=chat_id, text=text), priority)
+
+    async def send_document(self, chat_id: int, document, priority: int = Priority.REPLY, **kwargs):
+        return await self.submit("send_document", dict(kwargs, chat_id=chat_id, document=document), priority)
+
+    async def reply(self, message, text: str, priority: int = Priority.REPLY, **kwargs):
+        """Ответ в чат входящего сообщения (в ту же тему форума, как Message.answer)"""
+        return await self.send_message(message.chat.id, text, priority, **_thread_kwargs(message, kwargs))
+
+    async def reply_document(self, message, document, priority: int = Priority.REPLY, **kwargs):
+        return await self.send_document(message.chat.id, document, priority, **_thread_kwargs(message, kwargs))
+
+    async def edit_message_text(self, chat_id: int, message_id: int, text: str,
+                                priority: int = Priority.DASHBOARD, **kwargs):
+        """Правка сообщения; ожидающая правка того же сообщения заменяется новым текстом"""
+        kwargs.update(chat_id=chat_id, message_id=message_id, text=text)
+        key = (chat_id, message_id)
+        job = self._pending_edits.get(key)
+        if job is not None:
+            TELEGRAM_EDITS_COALESCED.inc()
+            job.kwargs = kwargs
+            future = asyncio.get_running_loop().create_future()
+            job.futures.append(future)
+            if priority < job.priority:
+                # Повторная запись в куче с более высоким приоритетом; старая будет пропущена
+                job.priority = priority
+                heapq.heappush(self._heap, (job.priority, job.seq, job))
+                self._notify()
+            return await future
+        return await self.submit("edit_message_text", kwargs, priority, edit_key=key)
+
+    def submit(self, method: str, params: Dict[str, Any], priority: int = Priority.REPLY,
+               edit_key: Optional[Tuple[int, int]] = None) -> asyncio.Future:
+        """Поставить вызов метода бота в очередь; future завершится результатом вызова"""
+        self._seq += 1
+        job = _Job(priority, self._seq, params["chat_id"], method, params, edit_key)
+        future = asyncio.get_running_loop().create_future()
+        job.futures.append(future)
+        if edit_key is not None:
+            self._pending_edits[edit_key] = job
+        self._push(job)
+        return future
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._global = TokenBucket(self._global_rate, self._global_rate, loop.time())
+        self._slots = asyncio.Semaphore(self._concurrency)
+        self._wakeup = asyncio.Event()
+        self._runner = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._runner:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        for _, _, job in self._heap:
+            for future in job.futures:
+                if not future.done():
+                    future.cancel()
+        self._heap.clear()
+        self._queued = 0
+        self._pending_edits.clear()
+        TELEGRAM_SEND_QUEUE_DEPTH.set(0)
+
+    # --- Внутреннее ---
+
+    def _push(self, job: _Job) -> None:
+        job.dispatched = False
+        heapq.heappush(self._heap, (job.priority, job.seq, job))
+        self._queued += 1
+        TELEGRAM_SEND_QUEUE_DEPTH.set(self._queued)
+        self._notify()
+
+    def _notify(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _chat_bucket(self, chat_id: int, now: float) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self._chat_buckets) > 1000 or len(self._blocked_until) > 1000:
+                self._prune_buckets(now)
+            # Отрицательные id — группы и каналы, для них лимит Telegram строже
+            if chat_id < 0:
+                bucket = TokenBucket(self._group_rate, self._group_burst, now)
+            else:
+                bucket = TokenBucket(self._chat_rate, self._chat_burst, now)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    def _prune_buckets(self, now: float) -> None:
+        idle = [
+            chat_id for chat_id, bucket in self._chat_buckets.items()
+            if chat_id not in self._in_flight and bucket.is_full(now)
+        ]
+        for chat_id in idle:
+            del self._chat_buckets[chat_id]
+        expired = [chat_id for chat_id, until in self._blocked_until.items() if until <= now]
+        for chat_id in expired:
+            del self._blocked_until[chat_id]
+
+    def _next_job(self, now: float) -> Tuple[Optional[_Job], Optional[float]]:
+        """Следующее задание, которое можно отправить сейчас, либо время ожидания"""
+        global_delay = self._global.delay(now)
+        if global_delay > 0:
+            return None, global_delay
+
+        wait: Optional[float] = None
+        deferred: List[Tuple[int, int, _Job]] = []
+        chosen: Optional[_Job] = None
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            job = entry[2]
+            # Устаревшая запись (задание уже отправлено или переставлено по приоритету)
+            if job.dispatched or entry[0] != job.priority:
+                continue
+            chat_id = job.chat_id
+            if chat_id in self._in_flight:
+                deferred.append(entry)
+                continue
+            delay = max(
+                self._blocked_until.get(chat_id, 0.0) - now,
+                self._chat_bucket(chat_id, now).delay(now),
+            )
+            if delay > 0:
+                wait = delay if wait is None else min(wait, delay)
+                deferred.append(entry)
+                continue
+            chosen = job
+            break
+
+        for entry in deferred:
+            heapq.heappush(self._heap, entry)
+
+        if chosen is not None:
+            chosen.dispatched = True
+            self._global.consume(now)
+            self._chat_bucket(chosen.chat_id, now).consume(now)
+            self._blocked_until.pop(chosen.chat_id, None)
+            self._in_flight.add(chosen.chat_id)
+            if chosen.edit_key is not None and self._pending_edits.get(chosen.edit_key) is chosen:
+                del self._pending_edits[chosen.edit_key]
+            self._queued -= 1
+            TELEGRAM_SEND_QUEUE_DEPTH.set(self._queued)
+        return chosen, wait
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._slots.acquire()
+            job, wait = self._next_job(loop.time())
+            if job is None:
+                self._slots.release()
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            task = asyncio.create_task(self._execute(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _requeue(self, job: _Job) -> None:
+        if job.edit_key is not None:
+            newer = self._pending_edits.get(job.edit_key)
+            if newer is not None:
+                # Пока запрос был в полете, пришла более свежая правка — она заменяет эту
+                newer.futures.extend(job.futures)
+                return
+            self._pending_edits[job.edit_key] = job
+        self._push(job)
+
+    async def _execute(self, job: _Job) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            result = await getattr(self._bot, job.method)(**job.kwargs)
+            self._resolve(job, result)
+        except TelegramRetryAfter as exc:
+            TELEGRAM_RATE_LIMITED.inc()
+            logger.warning("Telegram flood control for chat %s, retry after %s s", job.chat_id, exc.retry_after)
+            self._blocked_until[job.chat_id] = loop.time() + exc.retry_after
+            self._requeue(job)
+        except TelegramNetworkError as exc:
+            job.attempts += 1
+            if job.attempts >= self._max_attempts:
+                TELEGRAM_SEND_FAILURES.inc()
+                logger.exception("Failed to send message after retries: %s", exc)
+                self._fail(job, exc)
+            else:
+                TELEGRAM_SEND_RETRIES.inc()
+                logger.warning("Telegram network error, retry %s/%s: %s", job.attempts, self._max_attempts, exc)
+                self._blocked_until[job.chat_id] = loop.time() + 2 ** (job.attempts - 1)
+                self._requeue(job)
+        except TelegramBadRequest as exc:
+            if job.method == "edit_message_text" and "message is not modified" in str(exc):
+                self._resolve(job, None)
+            else:
+                self._fail(job, exc)
+        except Exception as exc:
+            self._fail(job, exc)
+        finally:
+            self._in_flight.discard(job.chat_id)
+            self._slots.release()
+            self._notify()
+
+    @staticmethod
+    def _resolve(job: _Job, result) -> None:
+        for future in job.futures:
+            if not future.done():
+                future.set_result(result)
+
+    @staticmethod
+    def _fail(job: _Job, exc: BaseException) -> None:
+        for future in job.futures:
+            if not future.done():
+                future.set_exception(exc)
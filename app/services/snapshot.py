@@ -0,0 +1,52 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+
+class TelemetrySnapshot(NamedTuple):
+    """Неизменяемый снимок данных OBD; version растет только при изменении содержимого"""
+
+    version: int
+    connected: bool
+    rpm: Optional[float] = None
+    speed: Optional[float] = None
+    coolant_temp: Optional[float] = None
+    intake_temp: Optional[float] = None
+    fuel_level: Optional[float] = None
+    engine_load: Optional[float] = None
+    # (code, description) — кортеж, чтобы набор ошибок можно было хешировать
+    errors: Tuple[Tuple[str, str], ...] = ()
+
+    @staticmethod
+    def content_from_sample(connected: bool, sample, errors: List[Dict[str, Any]]) -> tuple:
+        """Содержимое снимка (без версии) из TelemetrySample и списка ошибок OBDHandler.get_errors()"""
+        values = (None,) * 6 if sample is None else (
+            sample.rpm,
+            sample.speed,
+            sample.coolant_temp,
+            sample.intake_temp,
+            sample.fuel_level,
+            sample.engine_load,
+        )
+        return (
+            connected,
+            *values,
+            tuple((e.get("code", "N/A"), e.get("description") or "") for e in errors),
+        )
+
+    @classmethod
+    def from_content(cls, version: int, content: tuple) -> "TelemetrySnapshot":
+        return cls(version, *content)
+
+    def content(self) -> tuple:
+        """Содержимое снимка без версии — для сравнения с предыдущим"""
+        return self[1:]
+
+
+class TemperatureSnapshot(NamedTuple):
+    """Неизменяемый снимок температур для /temperature; версионируется так же, как TelemetrySnapshot"""
+
+    version: int
+    coolant_temp: Optional[float] = None
+    intake_temp: Optional[float] = None
+
+    def content(self) -> tuple:
+        return self[1:]
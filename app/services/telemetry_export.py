@@ -0,0 +1,150 @@
+"""
+Потоковый экспорт записанной телеметрии в CSV или Parquet.
+
+Замеры читаются из TelemetryStore генератором и пишутся блоками, поэтому
+объем памяти не зависит от длины окна экспорта.
+
+CLI:
+    python -m app.services.telemetry_export 24h --format parquet --output day.parquet
+"""
+import argparse
+import csv
+import importlib.util
+import io
+import os
+import re
+import sys
+import tempfile
+import time
+from itertools import islice
+from typing import IO, Iterable, Iterator, List, Tuple
+
+from app.services.obd_fast import TelemetrySample
+
+EXPORT_FORMATS = ("csv", "parquet")
+COLUMNS = TelemetrySample.FIELDS
+CHUNK_ROWS = 10000
+
+_WINDOW_RE = re.compile(r"^(\d+(?:\.\d+)?)([smhd])$")
+_WINDOW_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+MAX_WINDOW_SECONDS = 366 * 86400
+
+
+def parse_window(window: str) -> float:
+    """Длительность окна ("90s", "30m", "24h", "7d") в секундах, не больше года"""
+    match = _WINDOW_RE.match(window.strip().lower())
+    if not match:
+        raise ValueError(f"Некорректное окно экспорта: {window}")
+    seconds = float(match.group(1)) * _WINDOW_UNITS[match.group(2)]
+    if seconds <= 0 or seconds > MAX_WINDOW_SECONDS:
+        raise ValueError(f"Некорректное окно экспорта: {window}")
+    return seconds
+
+
+def iter_chunks(rows: Iterable[tuple], chunk_size: int = CHUNK_ROWS) -> Iterator[List[tuple]]:
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def write_csv(chunks: Iterable[List[tuple]], stream: IO[str]) -> int:
+    writer = csv.writer(stream)
+    writer.writerow(COLUMNS)
+    rows = 0
+    for chunk in chunks:
+        writer.writerows(chunk)
+        rows += len(chunk)
+    return rows
+
+
+def parquet_available() -> bool:
+    """Установлен ли pyarrow (в образ по умолчанию не входит)"""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def write_parquet(chunks: Iterable[List[tuple]], path: str) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Для экспорта в Parquet установите pyarrow (pip install pyarrow)")
+
+    schema = pa.schema([(name, pa.float64()) for name in COLUMNS])
+    rows = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        # Каждый блок — отдельная row group
+        for chunk in chunks:
+            columns = zip(*chunk)
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=pa.float64()) for column in columns],
+                schema=schema,
+            ))
+            rows += len(chunk)
+    return rows
+
+
+def export_to_file(store, since: float, until: float, fmt: str, path: str) -> int:
+    """Экспорт замеров за период в файл; возвращает количество строк"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Неизвестный формат экспорта: {fmt}")
+    chunks = iter_chunks(store.iter_rows(since, until))
+    if fmt == "parquet":
+        return write_parquet(chunks, path)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        return write_csv(chunks, f)
+
+
+def export_to_tempfile(store, window_seconds: float, fmt: str) -> Tuple[str, int]:
+    """Экспорт последних window_seconds во временный файл; удалить файл должен вызывающий"""
+    until = time.time()
+    fd, path = tempfile.mkstemp(prefix="telemetry-", suffix=f".{fmt}")
+    os.close(fd)
+    try:
+        rows = export_to_file(store, until - window_seconds, until, fmt, path)
+    except Exception:
+        os.remove(path)
+        raise
+    return path, rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Экспорт записанной телеметрии OBD")
+    parser.add_argument("window", help="Окно экспорта: 90s, 30m, 24h, 7d")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--output", default="-", help="Файл назначения (по умолчанию stdout, только для CSV)")
+    parser.add_argument("--dir", default=None, help="Каталог телеметрии (по умолчанию TELEMETRY_DIR)")
+    args = parser.parse_args(argv)
+
+    try:
+        window_seconds = parse_window(args.window)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.format == "parquet" and args.output == "-":
+        parser.error("Для Parquet укажите --output")
+
+    directory = args.dir
+    if directory is None:
+        from app.settings import settings
+        directory = settings.TELEMETRY_DIR
+
+    from app.storage.telemetry_store import TelemetryStore
+    store = TelemetryStore(directory)
+    until = time.time()
+    since = until - window_seconds
+
+    if args.output == "-":
+        stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", newline="")
+        rows = write_csv(iter_chunks(store.iter_rows(since, until)), stdout)
+        stdout.flush()
+        stdout.detach()
+    else:
+        rows = export_to_file(store, since, until, args.format, args.output)
+    print(f"Экспортировано строк: {rows}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+import asyncio
+import logging
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TelemetryRecorder:
+    """Фоновая запись замеров телеметрии, пока OBD адаптер подключен"""
+
+    def __init__(self, obd_provider, store, interval: float = 1.0) -> None:
+        self._obd = obd_provider
+        self._store = store
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        # Запись из потока может продолжаться после отмены задачи — закрытие ее дожидается
+        self._lock = threading.Lock()
+
+    def _record_once(self) -> None:
+        # Опрос адаптера и запись на диск блокирующие — выполняются в рабочем потоке
+        with self._lock:
+            sample = self._obd.get().read_sample()
+            if sample is not None:
+                self._store.append(sample)
+
+    def _close_store(self) -> None:
+        with self._lock:
+            self._store.close()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            # Не создаем OBDHandler ради записи: ждем, пока к нему обратятся команды
+            if self._obd.initialized and self._obd.get().is_connected:
+                try:
+                    await asyncio.to_thread(self._record_once)
+                except Exception as e:
+                    logger.error(f"Ошибка записи телеметрии: {e}")
+            await asyncio.sleep(max(0.0, self.interval - (loop.time() - started)))
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Запись телеметрии каждые {self.interval} с")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self._close_store)
@@ -2,6 +2,8 @@ import json
 from typing import List, Dict
 from redis.asyncio import Redis
 
+from app.core.metrics import REDIS_OPERATION_DURATION
+
 
 class RedisContextStore:
     def __init__(self, redis_url: str, max_history_messages: int = 20) -> None:
@@ -15,11 +17,13 @@ class RedisContextStore:
     async def append(self, session_key: str, role: str, content: str) -> None:
         entry = json.dumps({"role": role, "content": content})
         key = self._key(session_key)
-        await self._redis.rpush(key, entry)
-        await self._redis.ltrim(key, -self._max, -1)
+        with REDIS_OPERATION_DURATION.labels("append").time():
+            await self._redis.rpush(key, entry)
+            await self._redis.ltrim(key, -self._max, -1)
 
     async def history(self, session_key: str) -> List[Dict]:
-        items = await self._redis.lrange(self._key(session_key), 0, -1)
+        with REDIS_OPERATION_DURATION.labels("history").time():
+            items = await self._redis.lrange(self._key(session_key), 0, -1)
         result: List[Dict] = []
         for raw in items:
             try:
@@ -0,0 +1,100 @@
+import logging
+import struct
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional
+
+# timestamp + rpm, speed, coolant_temp, intake_temp, engine_load, fuel_level; NaN — нет значения
+_RECORD = struct.Struct("<7d")
+_NAN = float("nan")
+
+logger = logging.getLogger(__name__)
+
+
+def _utc_day(timestamp: float) -> date:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).date()
+
+
+class TelemetryStore:
+    """Хранилище замеров телеметрии: файл записей фиксированного размера на каждый день (UTC)"""
+
+    def __init__(self, directory: str, retention_days: int = 30, chunk_records: int = 4096) -> None:
+        self._dir = Path(directory)
+        self._retention_days = retention_days
+        self._chunk_records = chunk_records
+        self._file: Optional[BinaryIO] = None
+        self._file_day: Optional[date] = None
+
+    def _path(self, day: date) -> Path:
+        return self._dir / f"telemetry-{day:%Y%m%d}.bin"
+
+    def _days(self) -> List[date]:
+        """Дни, за которые есть файлы, по возрастанию"""
+        days = []
+        for path in self._dir.glob("telemetry-*.bin"):
+            try:
+                days.append(datetime.strptime(path.stem[len("telemetry-"):], "%Y%m%d").date())
+            except ValueError:
+                continue
+        return sorted(days)
+
+    def prune(self, today: date) -> None:
+        """Удаление файлов старше retention_days (0 — хранить все)"""
+        if self._retention_days <= 0:
+            return
+        oldest_kept = today - timedelta(days=self._retention_days - 1)
+        for day in self._days():
+            if day >= oldest_kept:
+                break
+            try:
+                self._path(day).unlink()
+                logger.info(f"Удален файл телеметрии за {day}")
+            except OSError as e:
+                logger.error(f"Не удалось удалить файл телеметрии за {day}: {e}")
+
+    def append(self, sample) -> None:
+        day = _utc_day(sample.timestamp)
+        if self._file is None or day != self._file_day:
+            self.close()
+            self._dir.mkdir(parents=True, exist_ok=True)
+            # Смена дня (или первый замер после запуска) — удаляем устаревшие файлы
+            self.prune(day)
+            self._file = open(self._path(day), "ab")
+            self._file_day = day
+        self._file.write(_RECORD.pack(*(_NAN if v is None else v for v in sample.as_tuple())))
+        self._file.flush()
+
+    def iter_rows(self, since: float, until: float) -> Iterator[tuple]:
+        """Построчное чтение замеров за период; в памяти держится не больше одного блока"""
+        chunk_size = _RECORD.size * self._chunk_records
+        first_day = _utc_day(since)
+        last_day = _utc_day(until)
+        # Перебираем только существующие файлы, а не все дни окна
+        for day in self._days():
+            if day < first_day:
+                continue
+            if day > last_day:
+                break
+            try:
+                f = open(self._path(day), "rb")
+            except FileNotFoundError:
+                continue
+            with f:
+                while True:
+                    chunk = f.read(chunk_size)
+                    # Хвост без полной записи — запись, которая еще дописывается
+                    usable = len(chunk) - len(chunk) % _RECORD.size
+                    if not usable:
+                        break
+                    for row in _RECORD.iter_unpack(memoryview(chunk)[:usable]):
+                        if since <= row[0] <= until:
+                            yield tuple(None if v != v else v for v in row)
+
+    def close(self) -> None:
+        if self._file:
+            try:
+                self._file.close()
+            except Exception:
+                pass
+            self._file = None
+            self._file_day = None
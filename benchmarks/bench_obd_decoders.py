@@ -0,0 +1,73 @@
+"""
+Сравнение стандартного декодирования python-OBD (pint Quantity) с быстрыми декодерами.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_obd_decoders.py [количество итераций]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import obd
+from obd.protocols import ECU
+
+from app.services.obd_fast import FAST_DECODERS, make_fast_command
+
+# Ответы ECU: режим 41, PID, байты данных
+SAMPLE_DATA = {
+    "RPM": bytes([0x41, 0x0C, 0x1A, 0xF8]),
+    "SPEED": bytes([0x41, 0x0D, 0x3C]),
+    "COOLANT_TEMP": bytes([0x41, 0x05, 0x7B]),
+    "INTAKE_TEMP": bytes([0x41, 0x0F, 0x46]),
+    "ENGINE_LOAD": bytes([0x41, 0x04, 0x66]),
+    "FUEL_LEVEL": bytes([0x41, 0x2F, 0x80]),
+    "THROTTLE_POS": bytes([0x41, 0x11, 0x33]),
+}
+
+
+class _Message:
+    """Минимальная замена obd.protocols.Message: только ECU и байты данных"""
+
+    __slots__ = ("ecu", "data")
+
+    def __init__(self, data: bytes) -> None:
+        self.ecu = ECU.ENGINE
+        self.data = bytearray(data)
+
+
+def _standard(command, data):
+    response = command([_Message(data)])
+    return float(response.value.magnitude)
+
+
+def _fast(command, data):
+    response = command([_Message(data)])
+    return response.value
+
+
+def main() -> None:
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(f"{'PID':<14}{'python-OBD, мкс':>18}{'быстрый, мкс':>16}{'ускорение':>12}")
+    for name in FAST_DECODERS:
+        standard_cmd = obd.commands[name]
+        fast_cmd = make_fast_command(standard_cmd)
+        data = SAMPLE_DATA[name]
+
+        expected = _standard(standard_cmd, data)
+        actual = _fast(fast_cmd, data)
+        assert abs(expected - actual) < 1e-9, f"{name}: {expected} != {actual}"
+
+        standard_time = min(timeit.repeat(lambda: _standard(standard_cmd, data), number=number, repeat=3))
+        fast_time = min(timeit.repeat(lambda: _fast(fast_cmd, data), number=number, repeat=3))
+        print(
+            f"{name:<14}"
+            f"{standard_time / number * 1e6:>18.2f}"
+            f"{fast_time / number * 1e6:>16.2f}"
+            f"{standard_time / fast_time:>11.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,19 @@
+import time
+
+_STARTED_AT = time.perf_counter()
+
 import asyncio
 import logging
-from aiogram import Bot, Dispatcher, types, F, Router
-from aiogram.filters import Command
-from aiogram.types import Message, InlineKeyboardButton
-from aiogram.utils.keyboard import InlineKeyboardBuilder
+from dataclasses import dataclass
+from aiogram import Bot, Dispatcher, Router
 
 from app.settings import settings
-from app.services.obd_handler import OBDHandler
-from app.clients.llm_client import LLMClient
-from app.storage.context_store import RedisContextStore
-from app.handlers import register_chat_handlers
+from app.core.lazy import Lazy
+from app.core.metrics import MetricsServer
+from app.handlers import register_chat_handlers, register_export_handlers, register_obd_handlers
+from app.services.send_queue import SendQueue
+from app.services.telemetry_recorder import TelemetryRecorder
+from app.storage.telemetry_store import TelemetryStore
 
 # Настройка логирования
 logging.basicConfig(
@@ -18,239 +22,109 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Инициализация бота и диспетчера
-bot = Bot(token=settings.BOT_TOKEN)
-dp = Dispatcher()
-router = Router()
-
-# Инициализация OBD обработчика
-obd_handler = OBDHandler()
-
-# Инициализация LLM и контекста
-llm_client = LLMClient(
-    api_key=settings.OPENAI_API_KEY,
-    base_url=settings.OPENAI_BASE_URL,
-    model=settings.OPENAI_MODEL,
-)
-context_store = RedisContextStore(redis_url=settings.REDIS_URL, max_history_messages=20)
-
-# Регистрация обработчиков чата (текстовые сообщения)
-register_chat_handlers(router, llm_client, context_store)
-dp.include_router(router)
 
+def _create_obd_handler():
+    # python-OBD тянет pint и его реестр единиц — импортируем только при первом обращении
+    from app.services.obd_handler import OBDHandler
+    return OBDHandler()
 
-def format_errors(errors: list) -> str:
-    """Форматирование списка ошибок для вывода"""
-    if not errors:
-        return "✅ Ошибок не обнаружено"
-    
-    text = "⚠️ Обнаружены ошибки:\n\n"
-    for i, error in enumerate(errors, 1):
-        text += f"{i}. {error.get('code', 'N/A')}\n"
-        if error.get('description'):
-            text += f"   {error['description']}\n"
-        text += "\n"
-    return text
 
-
-@dp.message(Command("start"))
-async def cmd_start(message: Message):
-    """Обработчик команды /start"""
-    keyboard = InlineKeyboardBuilder()
-    keyboard.add(InlineKeyboardButton(text="📊 Все данные", callback_data="all_data"))
-    keyboard.add(InlineKeyboardButton(text="🌡️ Температура", callback_data="temperature"))
-    keyboard.add(InlineKeyboardButton(text="⚠️ Ошибки", callback_data="errors"))
-    keyboard.add(InlineKeyboardButton(text="🔌 Подключить OBD", callback_data="connect"))
-    keyboard.add(InlineKeyboardButton(text="❌ Отключить OBD", callback_data="disconnect"))
-    keyboard.adjust(2, 2, 1)
-    
-    await message.answer(
-        "🚗 Добро пожаловать в Mercedes OBD бот!\n\n"
-        "Выберите действие:",
-        reply_markup=keyboard.as_markup()
+def _create_llm_client():
+    from app.clients.llm_client import LLMClient
+    return LLMClient(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_BASE_URL,
+        model=settings.OPENAI_MODEL,
     )
 
 
-@dp.message(Command("connect"))
-async def cmd_connect(message: Message):
-    """Обработчик команды /connect"""
-    await message.answer("⏳ Подключение к OBD адаптеру...")
-    
-    if obd_handler.connect():
-        await message.answer("✅ Успешно подключено к OBD адаптеру!")
-    else:
-        await message.answer(
-            "❌ Не удалось подключиться к OBD адаптеру.\n\n"
-            "Проверьте:\n"
-            "• Адаптер подключен и включен\n"
-            "• Bluetooth соединение установлено\n"
-            "• Правильно указан порт в настройках"
-        )
-
-
-@dp.message(Command("disconnect"))
-async def cmd_disconnect(message: Message):
-    """Обработчик команды /disconnect"""
-    obd_handler.disconnect()
-    await message.answer("🔌 Отключено от OBD адаптера")
-
-
-@dp.message(Command("status"))
-async def cmd_status(message: Message):
-    """Обработчик команды /status"""
-    status = "🟢 Подключено" if obd_handler.is_connected else "🔴 Не подключено"
-    await message.answer(f"Статус OBD: {status}")
-
-
-@dp.message(Command("errors"))
-async def cmd_errors(message: Message):
-    """Обработчик команды /errors"""
-    if not obd_handler.is_connected:
-        await message.answer("❌ Сначала подключитесь к OBD адаптеру (/connect)")
-        return
-    
-    errors = obd_handler.get_errors()
-    await message.answer(format_errors(errors))
-
-
-@dp.message(Command("clear_errors"))
-async def cmd_clear_errors(message: Message):
-    """Обработчик команды /clear_errors"""
-    if not obd_handler.is_connected:
-        await message.answer("❌ Сначала подключитесь к OBD адаптеру (/connect)")
-        return
-    
-    if obd_handler.clear_errors():
-        await message.answer("✅ Коды ошибок очищены")
-    else:
-        await message.answer("❌ Не удалось очистить коды ошибок")
-
-
-@dp.message(Command("temperature"))
-async def cmd_temperature(message: Message):
-    """Обработчик команды /temperature"""
-    if not obd_handler.is_connected:
-        await message.answer("❌ Сначала подключитесь к OBD адаптеру (/connect)")
-        return
-    
-    coolant_temp = obd_handler.get_temperature("coolant")
-    intake_temp = obd_handler.get_temperature("intake")
-    
-    text = "🌡️ Температура:\n\n"
-    if coolant_temp is not None:
-        text += f"Охлаждающая жидкость: {coolant_temp:.1f}°C\n"
-    else:
-        text += "Охлаждающая жидкость: N/A\n"
-    
-    if intake_temp is not None:
-        text += f"Впускной воздух: {intake_temp:.1f}°C\n"
-    else:
-        text += "Впускной воздух: N/A\n"
-    
-    await message.answer(text)
-
-
-@dp.message(Command("data"))
-async def cmd_data(message: Message):
-    """Обработчик команды /data - все данные"""
-    if not obd_handler.is_connected:
-        await message.answer("❌ Сначала подключитесь к OBD адаптеру (/connect)")
-        return
-    
-    data = obd_handler.get_all_data()
-    
-    text = "📊 Данные OBD:\n\n"
-    text += f"🔌 Статус: {'🟢 Подключено' if data['connected'] else '🔴 Не подключено'}\n\n"
-    
-    if data['rpm'] is not None:
-        text += f"⚙️ Обороты: {data['rpm']:.0f} об/мин\n"
-    if data['speed'] is not None:
-        text += f"🚗 Скорость: {data['speed']:.0f} км/ч\n"
-    if data['coolant_temp'] is not None:
-        text += f"🌡️ Температура охлаждающей жидкости: {data['coolant_temp']:.1f}°C\n"
-    if data['intake_temp'] is not None:
-        text += f"🌡️ Температура впускного воздуха: {data['intake_temp']:.1f}°C\n"
-    if data['fuel_level'] is not None:
-        text += f"⛽ Уровень топлива: {data['fuel_level']:.1f}%\n"
-    if data['engine_load'] is not None:
-        text += f"⚡ Нагрузка двигателя: {data['engine_load']:.1f}%\n"
-    
-    text += "\n" + format_errors(data['errors'])
-    
-    await message.answer(text)
-
-
-@dp.callback_query(F.data)
-async def process_callback(callback: types.CallbackQuery):
-    """Обработчик callback кнопок"""
-    await callback.answer()
-    
-    if callback.data == "connect":
-        await callback.message.answer("⏳ Подключение к OBD адаптеру...")
-        if obd_handler.connect():
-            await callback.message.answer("✅ Успешно подключено к OBD адаптеру!")
-        else:
-            await callback.message.answer("❌ Не удалось подключиться к OBD адаптеру.")
-    
-    elif callback.data == "disconnect":
-        obd_handler.disconnect()
-        await callback.message.answer("🔌 Отключено от OBD адаптера")
-    
-    elif callback.data == "errors":
-        if not obd_handler.is_connected:
-            await callback.message.answer("❌ Сначала подключитесь к OBD адаптеру")
-            return
-        errors = obd_handler.get_errors()
-        await callback.message.answer(format_errors(errors))
-    
-    elif callback.data == "temperature":
-        if not obd_handler.is_connected:
-            await callback.message.answer("❌ Сначала подключитесь к OBD адаптеру")
-            return
-        coolant_temp = obd_handler.get_temperature("coolant")
-        intake_temp = obd_handler.get_temperature("intake")
-        text = "🌡️ Температура:\n\n"
-        if coolant_temp is not None:
-            text += f"Охлаждающая жидкость: {coolant_temp:.1f}°C\n"
-        if intake_temp is not None:
-            text += f"Впускной воздух: {intake_temp:.1f}°C\n"
-        await callback.message.answer(text)
-    
-    elif callback.data == "all_data":
-        if not obd_handler.is_connected:
-            await callback.message.answer("❌ Сначала подключитесь к OBD адаптеру")
-            return
-        data = obd_handler.get_all_data()
-        text = "📊 Данные OBD:\n\n"
-        if data['rpm'] is not None:
-            text += f"⚙️ Обороты: {data['rpm']:.0f} об/мин\n"
-        if data['speed'] is not None:
-            text += f"🚗 Скорость: {data['speed']:.0f} км/ч\n"
-        if data['coolant_temp'] is not None:
-            text += f"🌡️ Температура охлаждающей жидкости: {data['coolant_temp']:.1f}°C\n"
-        if data['intake_temp'] is not None:
-            text += f"🌡️ Температура впускного воздуха: {data['intake_temp']:.1f}°C\n"
-        if data['fuel_level'] is not None:
-            text += f"⛽ Уровень топлива: {data['fuel_level']:.1f}%\n"
-        if data['engine_load'] is not None:
-            text += f"⚡ Нагрузка двигателя: {data['engine_load']:.1f}%\n"
-        text += "\n" + format_errors(data['errors'])
-        await callback.message.answer(text)
+def _create_context_store():
+    from app.storage.context_store import RedisContextStore
+    return RedisContextStore(redis_url=settings.REDIS_URL, max_history_messages=20)
+
+
+@dataclass
+class Application:
+    """Собранное приложение: бот, диспетчер и лениво создаваемые клиенты"""
+
+    bot: Bot
+    dp: Dispatcher
+    obd: Lazy
+    llm: Lazy
+    context_store: Lazy
+    telemetry_store: TelemetryStore
+    send_queue: SendQueue
+
+
+def create_app() -> Application:
+    """Фабрика приложения; тяжелые клиенты создаются при первом использовании"""
+    bot = Bot(token=settings.BOT_TOKEN)
+    dp = Dispatcher()
+
+    obd_provider = Lazy(_create_obd_handler, "OBDHandler")
+    llm_provider = Lazy(_create_llm_client, "LLMClient")
+    context_provider = Lazy(_create_context_store, "RedisContextStore")
+    telemetry_store = TelemetryStore(settings.TELEMETRY_DIR, settings.TELEMETRY_RETENTION_DAYS)
+    send_queue = SendQueue(bot)
+
+    # Команды OBD регистрируются раньше свободного текста
+    obd_router = Router()
+    register_obd_handlers(obd_router, obd_provider, send_queue)
+    dp.include_router(obd_router)
+
+    export_router = Router()
+    register_export_handlers(export_router, telemetry_store, send_queue)
+    dp.include_router(export_router)
+
+    chat_router = Router()
+    register_chat_handlers(chat_router, llm_provider, context_provider, send_queue)
+    dp.include_router(chat_router)
+
+    return Application(
+        bot=bot,
+        dp=dp,
+        obd=obd_provider,
+        llm=llm_provider,
+        context_store=context_provider,
+        telemetry_store=telemetry_store,
+        send_queue=send_queue,
+    )
 
 
 async def main():
     """Главная функция запуска бота"""
     logger.info("Запуск бота...")
+    app = create_app()
+    await app.send_queue.start()
+    metrics_server = None
+    if settings.METRICS_ENABLED:
+        metrics_server = MetricsServer(settings.METRICS_HOST, settings.METRICS_PORT)
+        try:
+            await metrics_server.start()
+        except OSError as e:
+            logger.error(f"Не удалось запустить сервер метрик: {e}")
+            metrics_server = None
+    recorder = None
+    if settings.TELEMETRY_ENABLED:
+        recorder = TelemetryRecorder(app.obd, app.telemetry_store, settings.TELEMETRY_INTERVAL)
+        await recorder.start()
+    logger.info(f"Бот готов к получению обновлений за {time.perf_counter() - _STARTED_AT:.3f} с")
     try:
-        await dp.start_polling(bot)
+        await app.dp.start_polling(app.bot)
     except Exception as e:
         logger.error(f"Ошибка при запуске бота: {e}")
     finally:
-        obd_handler.disconnect()
-        await bot.session.close()
-        await context_store.close()
+        if recorder:
+            await recorder.stop()
+        if metrics_server:
+            await metrics_server.stop()
+        await app.send_queue.stop()
+        if app.obd.initialized:
+            app.obd.get().disconnect()
+        await app.bot.session.close()
+        if app.context_store.initialized:
+            await app.context_store.get().close()
 
 
 if __name__ == "__main__":
     asyncio.run(main())
-